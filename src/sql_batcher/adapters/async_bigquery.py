@@ -8,6 +8,7 @@ optimizations for BigQuery's features and limitations.
 from typing import Any, Dict, List, Optional
 
 from sql_batcher.adapters.async_base import AsyncSQLAdapter
+from sql_batcher.utils import is_select
 
 try:
     import asyncio
@@ -131,7 +132,7 @@ class AsyncBigQueryAdapter(AsyncSQLAdapter):
                 await asyncio.to_thread(query_job.result)
 
                 # For SELECT statements, return the results
-                if statement.strip().upper().startswith("SELECT"):
+                if is_select(statement):
                     rows = await asyncio.to_thread(list, query_job.result())
                     results.extend(rows)
 
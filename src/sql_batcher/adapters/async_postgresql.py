@@ -8,6 +8,7 @@ optimizations for PostgreSQL features like COPY commands and transaction managem
 from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
 from sql_batcher.adapters.async_base import AsyncSQLAdapter
+from sql_batcher.utils import is_select
 
 try:
     import asyncpg
@@ -98,12 +99,12 @@ class AsyncPostgreSQLAdapter(AsyncSQLAdapter):
             conn = await self._pool.acquire()
             try:
                 # Optimization: Check if this is a batch of statements
-                if ";" in sql and not sql.strip().upper().startswith("SELECT"):
+                if ";" in sql and not is_select(sql):
                     # For batches of non-SELECT statements, execute them all at once
                     await conn.execute(sql)
                     return []
                 # For SELECT statements or single statements, use the standard approach
-                elif sql.strip().upper().startswith("SELECT"):
+                elif is_select(sql):
                     result = await conn.fetch(sql)
                     return list(result) if result is not None else []
                 else:
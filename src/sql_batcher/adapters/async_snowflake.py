@@ -8,6 +8,7 @@ optimizations for Snowflake's features and limitations.
 from typing import Any, Dict, List, Optional
 
 from sql_batcher.adapters.async_base import AsyncSQLAdapter
+from sql_batcher.utils import is_select
 
 try:
     import asyncio
@@ -127,7 +128,7 @@ class AsyncSnowflakeAdapter(AsyncSQLAdapter):
             result = await asyncio.to_thread(cursor.execute, sql)
 
             # For SELECT statements, return the results
-            if sql.strip().upper().startswith("SELECT"):
+            if is_select(sql):
                 rows = await asyncio.to_thread(result.fetchall)
                 return list(rows) if rows is not None else []
             return []
@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional, Type
 
 from sql_batcher.adapters.async_base import AsyncSQLAdapter
 from sql_batcher.retry import CircuitBreaker, async_retry
+from sql_batcher.utils import is_select
 
 try:
     import aiotrino
@@ -161,7 +162,7 @@ class AsyncTrinoAdapter(AsyncSQLAdapter):
             await cursor.execute(statement)
 
             # For SELECT statements, return the results
-            if statement.upper().startswith("SELECT"):
+            if is_select(statement):
                 rows = await cursor.fetchall()
                 return rows
             return []
@@ -182,7 +183,7 @@ class AsyncTrinoAdapter(AsyncSQLAdapter):
                 await cursor.execute(statement)
 
                 # For SELECT statements, return the results
-                if statement.upper().startswith("SELECT"):
+                if is_select(statement):
                     rows = await cursor.fetchall()
                     results.extend(rows)
 
@@ -204,13 +205,7 @@ class AsyncTrinoAdapter(AsyncSQLAdapter):
             List of result rows (for SELECT queries) or empty list for others
         """
         try:
-            # Apply circuit breaker if enabled
-            if self._circuit_breaker_enabled:
-                execute_func = self._circuit_breaker.async_call(self._execute_with_retry)
-            else:
-                execute_func = self._execute_with_retry
-
-            # Apply retry logic
+            # Apply retry logic, with the circuit breaker (if enabled) checked before each attempt
             retry_execute = async_retry(
                 max_attempts=self._retry_attempts,
                 base_delay=self._retry_delay,
@@ -218,7 +213,8 @@ class AsyncTrinoAdapter(AsyncSQLAdapter):
                 backoff_factor=self._retry_backoff_factor,
                 jitter=self._retry_jitter,
                 retryable_exceptions=self._retry_exceptions,
-            )(execute_func)
+                circuit_breaker=self._circuit_breaker if self._circuit_breaker_enabled else None,
+            )(self._execute_with_retry)
 
             # Execute with retry and circuit breaker protection
             return await retry_execute(sql)
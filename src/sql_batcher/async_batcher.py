@@ -5,12 +5,20 @@ This module contains the AsyncSQLBatcher class, which is the main entry point fo
 batching SQL statements asynchronously based on size limits.
 """
 
+import logging
 import re
 from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from sql_batcher.adapters.async_base import AsyncSQLAdapter
 from sql_batcher.async_query_collector import AsyncQueryCollector
-from sql_batcher.insert_merger import InsertMerger
+from sql_batcher.insert_merger import InsertMerger, count_values_columns
+from sql_batcher.utils import utf8_len
+
+logger = logging.getLogger(__name__)
+
+# Patterns used by detect_column_count, compiled once instead of per statement
+_INSERT_INTO_RE = re.compile(r"^\s*INSERT\s+INTO", re.IGNORECASE)
+_COLUMNS_GROUP_RE = re.compile(r"INSERT\s+INTO\s+\w+\s*\(([^)]*)\)", re.IGNORECASE)
 
 
 class AsyncSQLBatcher:
@@ -57,7 +65,6 @@ class AsyncSQLBatcher:
         self.max_bytes = self._max_bytes
         self.delimiter = self._collector.get_delimiter()
         self.dry_run = self._collector.is_dry_run()
-        self.current_batch = self._collector.get_batch()
         self.current_size = self._collector.get_current_size()
         self.auto_adjust_for_columns = kwargs.get("auto_adjust_for_columns", False)
         self.reference_column_count = self._collector.get_reference_column_count()
@@ -67,6 +74,16 @@ class AsyncSQLBatcher:
         self.adjustment_factor = self._collector.get_adjustment_factor()
         self.merge_inserts = self._merge_inserts
 
+    @property
+    def current_batch(self) -> List[str]:
+        """
+        Get a copy of the statements in the current batch.
+
+        Returns:
+            Statements added since the last flush or reset
+        """
+        return self._collector.get_batch()
+
     def detect_column_count(self, statement: str) -> Optional[int]:
         """
         Detect the number of columns in an INSERT statement.
@@ -78,30 +95,16 @@ class AsyncSQLBatcher:
             Number of columns detected, or None if not an INSERT statement or cannot be determined
         """
         # Only process INSERT statements
-        if not re.search(r"^\s*INSERT\s+INTO", statement, re.IGNORECASE):
+        if not _INSERT_INTO_RE.search(statement):
             return None
 
-        # Try to find column count from VALUES clause
-        values_pattern = r"VALUES\s*\(([^)]*)\)"
-        match = re.search(values_pattern, statement, re.IGNORECASE)
-        if match:
-            # Count commas in the first VALUES group and add 1
-            values_content = match.group(1)
-            # Handle nested parentheses in complex expressions
-            depth = 0
-            comma_count = 0
-            for char in values_content:
-                if char == "(" or char == "[" or char == "{":
-                    depth += 1
-                elif char == ")" or char == "]" or char == "}":
-                    depth -= 1
-                elif char == "," and depth == 0:
-                    comma_count += 1
-            return comma_count + 1
+        # Try to find column count from the first VALUES tuple
+        value_count = count_values_columns(statement)
+        if value_count is not None:
+            return value_count
 
         # Try to find explicit column list
-        columns_pattern = r"INSERT\s+INTO\s+\w+\s*\(([^)]*)\)"
-        match = re.search(columns_pattern, statement, re.IGNORECASE)
+        match = _COLUMNS_GROUP_RE.search(statement)
         if match:
             columns_str = match.group(1)
             # Count commas in the column list and add 1
@@ -141,12 +144,11 @@ class AsyncSQLBatcher:
                 self.adjustment_factor = factor
 
                 # Logging for debugging
-                import logging
-
-                logging.debug(
-                    f"Column-based adjustment: detected {self._collector.get_column_count()} columns, "
-                    f"reference is {self._collector.get_reference_column_count()}, "
-                    f"adjustment factor is {self._collector.get_adjustment_factor():.2f}"
+                logger.debug(
+                    "Column-based adjustment: detected %d columns, reference is %d, adjustment factor is %.2f",
+                    detected_count,
+                    self._collector.get_reference_column_count(),
+                    factor,
                 )
 
     def get_adjusted_max_bytes(self) -> int:
@@ -182,21 +184,17 @@ class AsyncSQLBatcher:
         adjusted_max_bytes = self.get_adjusted_max_bytes()
 
         # Check if adding this statement would exceed the batch size
-        statement_size = len(statement.encode("utf-8"))
+        statement_size = utf8_len(statement)
         current_size = await self._collector.get_current_size_async()
 
         # If adding this statement would exceed the batch size, return True
         if current_size + statement_size >= adjusted_max_bytes and current_size > 0:
             return True
 
-        # Add statement to batch
-        await self._collector.collect_async(statement)
-
-        # Update size
-        await self._collector.update_current_size_async(statement_size)
+        # Add statement to batch, reusing the size measured above
+        await self._collector.collect_async(statement, size=statement_size)
 
         # Update public attributes
-        self.current_batch = await self._collector.get_batch_async()
         self.current_size = await self._collector.get_current_size_async()
 
         # Check if batch should be flushed after adding this statement
@@ -211,7 +209,6 @@ class AsyncSQLBatcher:
         self._collector.set_adjustment_factor(1.0)
         self.adjustment_factor = 1.0
         # Update public attributes
-        self.current_batch = await self._collector.get_batch_async()
         self.current_size = await self._collector.get_current_size_async()
 
     async def flush(
@@ -258,7 +255,6 @@ class AsyncSQLBatcher:
             await self.reset()
 
             # Update public attributes
-            self.current_batch = await self._collector.get_batch_async()
             self.current_size = await self._collector.get_current_size_async()
 
             # Return the count
@@ -279,16 +275,7 @@ class AsyncSQLBatcher:
             Optimized list of SQL statements with compatible INSERTs merged.
         """
         merger = InsertMerger(self.get_adjusted_max_bytes())
-        merged_statements: List[str] = []
-
-        for statement in statements:
-            result = merger.add_statement(statement)
-            if result is not None:  # Check for None, as empty strings are valid SQL statements
-                merged_statements.append(result)
-
-        # Ensure we get any remaining statements from the merger
-        merged_statements.extend(merger.flush_all())
-        return merged_statements
+        return merger.merge(statements)
 
     async def process_statements(
         self,
@@ -314,7 +301,7 @@ class AsyncSQLBatcher:
             statements = self._merge_insert_statements(statements)
 
         # Optimization: Pre-calculate statement sizes to avoid repeated encoding
-        statement_sizes = [len(stmt.encode("utf-8")) for stmt in statements]
+        statement_sizes = list(map(utf8_len, statements))
 
         # Optimization: Process statements in batches rather than one by one
         current_batch: List[str] = []
@@ -327,7 +314,7 @@ class AsyncSQLBatcher:
             if not statement.strip().endswith(self._collector.get_delimiter()):
                 statement = statement.strip() + self._collector.get_delimiter()
                 statements[i] = statement  # Update the statement with delimiter
-                statement_sizes[i] = len(statement.encode("utf-8"))  # Update size
+                statement_sizes[i] = utf8_len(statement)  # Update size
 
             # Update adjustment factor if needed (only for the first statement)
             if i == 0 and self.auto_adjust_for_columns:
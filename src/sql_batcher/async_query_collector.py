@@ -2,6 +2,7 @@
 AsyncQueryCollector: An async utility class for collecting and tracking SQL queries.
 """
 
+import warnings
 from typing import Any, Dict, List, Optional
 
 from sql_batcher.query_collector import QueryCollector
@@ -28,17 +29,19 @@ class AsyncQueryCollector(QueryCollector):
         merge_inserts (bool): Whether to merge compatible INSERT statements.
     """
 
-    async def collect_async(self, query: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+    async def collect_async(self, query: str, metadata: Optional[Dict[str, Any]] = None, size: Optional[int] = None) -> None:
         """
-        Collect a SQL query asynchronously.
+        Collect a SQL query asynchronously and add its size to the current size.
 
         Parameters:
             query (str): The SQL query to collect.
             metadata (Optional[Dict[str, Any]]): Optional metadata to associate with the query.
+            size (Optional[int]): Size of the query in bytes, if the caller has already
+                measured it. Measured here when not given.
         """
         # For now, just call the synchronous version
         # This is fine because the collection operation is not I/O bound
-        self.collect(query, metadata)
+        self.collect(query, metadata, size)
 
     async def clear_async(self) -> None:
         """Clear all collected queries asynchronously."""
@@ -85,10 +88,18 @@ class AsyncQueryCollector(QueryCollector):
         """
         Update the current size of collected queries asynchronously.
 
+        Deprecated: collect_async() already adds each query's size, so calling
+        this after collect_async() counts the query twice.
+
         Parameters:
             size (int): Size to add to current size.
         """
-        self.update_current_size(size)
+        warnings.warn(
+            "update_current_size_async is deprecated; collect_async() already adds the query size",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        self.current_size += size
 
     async def reset_async(self) -> None:
         """Reset the collector state asynchronously."""
@@ -5,13 +5,20 @@ This module contains the SQLBatcher class, which is the main entry point for
 batching SQL statements based on size limits.
 """
 
+import logging
 import re
 from typing import Any, Callable, Dict, List, Optional
 
 from sql_batcher.adapters.base import SQLAdapter
-from sql_batcher.insert_merger import InsertMerger
+from sql_batcher.insert_merger import InsertMerger, count_values_columns
 from sql_batcher.query_collector import QueryCollector
 
+logger = logging.getLogger(__name__)
+
+# Patterns used by detect_column_count, compiled once instead of per statement
+_INSERT_INTO_RE = re.compile(r"^\s*INSERT\s+INTO", re.IGNORECASE)
+_COLUMNS_GROUP_RE = re.compile(r"INSERT\s+INTO\s+\w+\s*\(([^)]*)\)", re.IGNORECASE)
+
 
 class SQLBatcher:
     """
@@ -56,7 +63,6 @@ class SQLBatcher:
         self.max_bytes = self._max_bytes
         self.delimiter = self._collector.get_delimiter()
         self.dry_run = self._collector.is_dry_run()
-        self.current_batch = self._collector.get_batch()
         self.current_size = self._collector.get_current_size()
         self.auto_adjust_for_columns = kwargs.get("auto_adjust_for_columns", False)
         self.reference_column_count = self._collector.get_reference_column_count()
@@ -66,6 +72,16 @@ class SQLBatcher:
         self.adjustment_factor = self._collector.get_adjustment_factor()
         self.merge_inserts = self._merge_inserts
 
+    @property
+    def current_batch(self) -> List[str]:
+        """
+        Get a copy of the statements in the current batch.
+
+        Returns:
+            Statements added since the last flush or reset
+        """
+        return self._collector.get_batch()
+
     def detect_column_count(self, statement: str) -> Optional[int]:
         """
         Detect the number of columns in an INSERT statement.
@@ -77,30 +93,16 @@ class SQLBatcher:
             Number of columns detected, or None if not an INSERT statement or cannot be determined
         """
         # Only process INSERT statements
-        if not re.search(r"^\s*INSERT\s+INTO", statement, re.IGNORECASE):
+        if not _INSERT_INTO_RE.search(statement):
             return None
 
-        # Try to find column count from VALUES clause
-        values_pattern = r"VALUES\s*\(([^)]*)\)"
-        match = re.search(values_pattern, statement, re.IGNORECASE)
-        if match:
-            # Count commas in the first VALUES group and add 1
-            values_content = match.group(1)
-            # Handle nested parentheses in complex expressions
-            depth = 0
-            comma_count = 0
-            for char in values_content:
-                if char == "(" or char == "[" or char == "{":
-                    depth += 1
-                elif char == ")" or char == "]" or char == "}":
-                    depth -= 1
-                elif char == "," and depth == 0:
-                    comma_count += 1
-            return comma_count + 1
+        # Try to find column count from the first VALUES tuple
+        value_count = count_values_columns(statement)
+        if value_count is not None:
+            return value_count
 
         # Try to find explicit column list
-        columns_pattern = r"INSERT\s+INTO\s+\w+\s*\(([^)]*)\)"
-        match = re.search(columns_pattern, statement, re.IGNORECASE)
+        match = _COLUMNS_GROUP_RE.search(statement)
         if match:
             columns_str = match.group(1)
             # Count commas in the column list and add 1
@@ -140,12 +142,11 @@ class SQLBatcher:
                 self.adjustment_factor = factor
 
                 # Logging for debugging
-                import logging
-
-                logging.debug(
-                    f"Column-based adjustment: detected {self._collector.get_column_count()} columns, "
-                    f"reference is {self._collector.get_reference_column_count()}, "
-                    f"adjustment factor is {self._collector.get_adjustment_factor():.2f}"
+                logger.debug(
+                    "Column-based adjustment: detected %d columns, reference is %d, adjustment factor is %.2f",
+                    detected_count,
+                    self._collector.get_reference_column_count(),
+                    factor,
                 )
 
     def get_adjusted_max_bytes(self) -> int:
@@ -177,15 +178,10 @@ class SQLBatcher:
         if not statement.strip().endswith(self._collector.get_delimiter()):
             statement = statement.strip() + self._collector.get_delimiter()
 
-        # Add statement to batch
+        # Add statement to batch, which also updates the batch size
         self._collector.collect(statement)
 
-        # Update size
-        statement_size = len(statement.encode("utf-8"))
-        self._collector.update_current_size(statement_size)
-
         # Update public attributes
-        self.current_batch = self._collector.get_batch()
         self.current_size = self._collector.get_current_size()
 
         # Get adjusted max_bytes for comparison
@@ -198,7 +194,6 @@ class SQLBatcher:
         """Reset the current batch."""
         self._collector.reset()
         # Update public attributes
-        self.current_batch = self._collector.get_batch()
         self.current_size = self._collector.get_current_size()
 
     def flush(
@@ -245,7 +240,6 @@ class SQLBatcher:
             self.reset()
 
             # Update public attributes
-            self.current_batch = self._collector.get_batch()
             self.current_size = self._collector.get_current_size()
 
             # Return the count
@@ -266,16 +260,7 @@ class SQLBatcher:
             Optimized list of SQL statements with compatible INSERTs merged.
         """
         merger = InsertMerger(self.get_adjusted_max_bytes())
-        merged_statements: List[str] = []
-
-        for statement in statements:
-            result = merger.add_statement(statement)
-            if result is not None:  # Check for None, as empty strings are valid SQL statements
-                merged_statements.append(result)
-
-        # Ensure we get any remaining statements from the merger
-        merged_statements.extend(merger.flush_all())
-        return merged_statements
+        return merger.merge(statements)
 
     def process_statements(
         self,
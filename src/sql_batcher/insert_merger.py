@@ -6,23 +6,218 @@ to reduce the number of database calls and improve performance.
 """
 
 import re
-from typing import Dict, List, Optional, Protocol, TypedDict
+import threading
+from sys import intern
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from sql_batcher.utils import utf8_len
 
-class TableData(TypedDict):
-    """Type definition for table data dictionary."""
+# Cheap check used to skip non-INSERT statements before the full parse.
+# Group 1 is the leading whitespace, so its end is where the INSERT starts.
+_INSERT_PREFIX_RE = re.compile(r"(\s*)INSERT\b", re.IGNORECASE)
 
-    columns: str
-    values: List[str]
-    bytes: int
+# Matches and extracts the table and optional column list of an INSERT, up to
+# the VALUES keyword. The tuples that follow are found by _scan_values.
+_INSERT_RE = re.compile(
+    r"INSERT\s+INTO\s+([^\s(]+)\s*(\([^)]+\))?\s*VALUES\b",
+    re.IGNORECASE,
+)
 
+# Structural tokens inside a VALUES tuple. Quoted literals are matched whole (a
+# doubled quote just splits one into two), and a lone quote means it is unclosed.
+_TUPLE_TOKEN_RE = re.compile(r"'[^']*'|\"[^\"]*\"|[()\[\]{},'\"]")
 
-class QueryCollector(Protocol):
-    """Protocol defining the interface for a query collector."""
+# Finds the opening parenthesis of the first VALUES tuple
+_VALUES_TUPLE_START_RE = re.compile(r"VALUES\s*\(", re.IGNORECASE)
 
-    def collect(self, query: str, metadata: Optional[Dict] = None) -> None:
-        """Collect a SQL query."""
-        ...
+_SPACE_RE = re.compile(r"\s*")
+
+# What may follow the VALUES tuples of a mergeable INSERT
+_TRAILER_RE = re.compile(r"\s*;?\s*")
+
+
+# Buffered INSERTs are grouped by (table name, column list)
+TableKey = Tuple[str, str]
+
+
+def _normalize_columns(columns: str) -> str:
+    """
+    Normalize the whitespace in an INSERT column list.
+
+    Column order is kept, since it decides which value goes where, but
+    "(id,name)" and "( id , name )" both become "(id, name)" so they share a
+    merge group. Lists with quoted identifiers are left alone, as a quoted
+    name may itself contain a comma.
+
+    Args:
+        columns: Column list including its parentheses, or an empty string.
+
+    Returns:
+        The normalized column list.
+    """
+    if not columns or '"' in columns or "`" in columns:
+        return columns
+    return "(" + ", ".join(name.strip() for name in columns[1:-1].split(",")) + ")"
+
+
+def _scan_tuple(statement: str, pos: int) -> Tuple[int, int]:
+    """
+    Walk one parenthesised VALUES tuple.
+
+    Skips over quoted literals and nested brackets, so commas and parentheses
+    inside strings, function calls or arrays neither end the tuple early nor
+    count as separators. Only structural tokens reach Python; the regex engine
+    steps over everything else.
+
+    Args:
+        statement: The SQL statement to scan.
+        pos: Index of the tuple's opening parenthesis.
+
+    Returns:
+        The index just past the closing parenthesis and the number of
+        top-level commas in the tuple, or (-1, 0) if the tuple is not closed.
+    """
+    depth = 0
+    commas = 0
+    for match in _TUPLE_TOKEN_RE.finditer(statement, pos):
+        token = match.group()
+        char = token[0]
+        if char == "(" or char == "[" or char == "{":
+            depth += 1
+        elif char == ")" or char == "]" or char == "}":
+            depth -= 1
+            if depth == 0:
+                return match.end(), commas
+        elif char == ",":
+            if depth == 1:
+                commas += 1
+        elif len(token) == 1:
+            # A quote with no closing quote
+            break
+    return -1, 0
+
+
+def _skip_space(statement: str, pos: int) -> int:
+    """
+    Skip whitespace in a statement.
+
+    Args:
+        statement: The SQL statement to scan.
+        pos: Index to start from.
+
+    Returns:
+        Index of the first non-whitespace character at or after pos.
+    """
+    match = _SPACE_RE.match(statement, pos)
+    assert match is not None  # \s* matches at any position
+    return match.end()
+
+
+def _scan_values(statement: str, pos: int) -> Optional[Tuple[int, int]]:
+    """
+    Find the VALUES tuples of an INSERT statement.
+
+    Args:
+        statement: The SQL statement to scan.
+        pos: Index just after the VALUES keyword.
+
+    Returns:
+        The start and end index of the tuples, or None if the statement is not
+        a plain list of tuples followed by at most a delimiter.
+    """
+    n = len(statement)
+    pos = _skip_space(statement, pos)
+    start = pos
+
+    while True:
+        if pos >= n or statement[pos] != "(":
+            return None
+
+        end = _scan_tuple(statement, pos)[0]
+        if end < 0:
+            return None
+
+        # Another tuple follows a comma, otherwise the list ends here
+        pos = _skip_space(statement, end)
+        if pos < n and statement[pos] == ",":
+            pos = _skip_space(statement, pos + 1)
+            continue
+        break
+
+    # Trailing clauses such as ON CONFLICT or RETURNING can't be merged
+    if not _TRAILER_RE.fullmatch(statement, pos):
+        return None
+    return start, end
+
+
+def count_values_columns(statement: str) -> Optional[int]:
+    """
+    Count the values in the first VALUES tuple of a statement.
+
+    Args:
+        statement: The SQL statement to analyze.
+
+    Returns:
+        Number of values in the first tuple, or None if there is no complete
+        VALUES tuple.
+    """
+    match = _VALUES_TUPLE_START_RE.search(statement)
+    if not match:
+        return None
+
+    end, commas = _scan_tuple(statement, match.end() - 1)
+    if end < 0:
+        return None
+    return commas + 1
+
+
+def _statement_prefix(table_name: str, columns: str) -> str:
+    """
+    Build the text of a merged INSERT statement that comes before its values.
+
+    Args:
+        table_name: The name of the table.
+        columns: Column specification string, if any.
+
+    Returns:
+        The statement prefix, ending with ``VALUES`` and a space.
+    """
+    if columns:
+        return f"INSERT INTO {table_name} {columns} VALUES "
+    return f"INSERT INTO {table_name} VALUES "
+
+
+class TableBatch:
+    """
+    Buffered VALUES tuples for one (table name, column list) key.
+
+    Uses __slots__ because an entry is read and updated for every buffered
+    INSERT, and attribute access on a slotted object is cheaper than dict
+    indexing.
+
+    Attributes:
+        columns: Column specification string, if any.
+        values: Buffered VALUES tuples.
+        bytes: Size of the buffered values, including a separator per value.
+        prefix: Merged statement text up to and including ``VALUES``.
+        prefix_bytes: Size of the prefix in bytes.
+    """
+
+    __slots__ = ("columns", "values", "bytes", "prefix", "prefix_bytes")
+
+    def __init__(self, columns: str, prefix: str) -> None:
+        """
+        Initialize an empty batch.
+
+        Args:
+            columns: Column specification string, if any.
+            prefix: Merged statement text up to and including ``VALUES``.
+        """
+        self.columns = columns
+        self.values: List[str] = []
+        self.bytes = 0
+        self.prefix = prefix
+        self.prefix_bytes = utf8_len(prefix)
 
 
 class InsertMerger:
@@ -30,38 +225,46 @@ class InsertMerger:
     A class that manages the merging of compatible INSERT statements.
 
     This class identifies simple INSERT INTO statements that can be merged
-    and combines them to reduce the number of database calls.
+    and combines them to reduce the number of database calls. It is safe to
+    share between threads.
 
     Attributes:
         max_bytes: Maximum size for a merged statement in bytes.
-        table_maps: Maps table names to parsed INSERT data.
+        max_values: Maximum number of statements merged into one, if limited.
+        table_maps: Maps (table name, column list) keys to parsed INSERT data.
     """
 
-    def __init__(self, max_bytes: int = 900_000):
+    def __init__(self, max_bytes: int = 900_000, max_values: Optional[int] = None):
         """
         Initialize the InsertMerger with a maximum byte size.
 
         Args:
             max_bytes: Maximum size for a merged statement in bytes.
                        Default is 900,000 bytes (slightly under 1MB).
+            max_values: Maximum number of statements merged into one.
+                        Default is None (limited by max_bytes only).
         """
         self.max_bytes = max_bytes
-        self.table_maps: Dict[str, TableData] = {}
+        self.max_values = max_values
+        self.table_maps: Dict[TableKey, TableBatch] = {}
+
+        # Guards table_maps and the buffered entries. Parsing and building merged
+        # statements happen outside it.
+        self._lock = threading.Lock()
 
-        # Regex for matching and extracting parts of an INSERT INTO statement
-        self.insert_regex = re.compile(
-            r"INSERT\s+INTO\s+([^\s(]+)\s*(\([^)]+\))?\s*VALUES\s*(\([^)]+\))",
-            re.IGNORECASE,
-        )
+        # Text up to the VALUES tuple of the last parsed statement, and its table
+        # and columns. Runs of statements with the same shape skip the full parse.
+        # Kept in one tuple so threads always see a matching prefix and key.
+        self._last_shape: Optional[Tuple[str, TableKey]] = None
 
     def add_statement(self, statement: str) -> Optional[str]:
         """
         Attempts to add a statement to be merged.
 
         If the statement is a compatible INSERT, it will be buffered for merging.
-        If adding the statement would exceed the max_bytes limit, the currently
-        buffered statements are merged and returned, and the new statement
-        starts a fresh batch.
+        If adding the statement would exceed the max_bytes or max_values limit,
+        the currently buffered statements are merged and returned, and the new
+        statement starts a fresh batch.
 
         Args:
             statement: The SQL statement to process.
@@ -70,103 +273,126 @@ class InsertMerger:
             A merged SQL statement if one is ready, or the original statement
             if it can't be merged, or None if the statement was buffered.
         """
-        # Check if this is an INSERT statement we can handle
-        match = self.insert_regex.match(statement.strip())
-        if not match:
-            # Not an INSERT or not in a format we can merge, return as is
+        # Pass non-INSERT statements straight through without parsing them
+        prefix_match = _INSERT_PREFIX_RE.match(statement)
+        if not prefix_match:
             return statement
 
-        table_name = match.group(1).strip()
-        columns = match.group(2) or ""  # Maybe None if not specified
-        values = match.group(3).strip()
+        # Parse from the INSERT keyword instead of stripping a copy of the statement
+        start = prefix_match.end(1)
 
-        # If this is a new table, initialize its entry
-        if table_name not in self.table_maps:
-            self.table_maps[table_name] = {"columns": columns, "values": [], "bytes": 0}
+        # Fast path: same table and columns as the previous statement
+        last_shape = self._last_shape
+        if last_shape is not None and statement.startswith(last_shape[0], start):
+            key = last_shape[1]
+            values_pos = start + len(last_shape[0])
+        else:
+            # Check if this is an INSERT statement we can handle
+            match = _INSERT_RE.match(statement, start)
+            if not match:
+                # Not an INSERT or not in a format we can merge, return as is
+                return statement
 
-        table_data = self.table_maps[table_name]
+            table_name = match.group(1).strip()
+            columns = _normalize_columns(match.group(2) or "")  # Maybe None if not specified
 
-        # If columns don't match, we can't merge
-        if table_data["columns"] != columns:
-            return statement
+            # Interned so repeated shapes share one key string and compare by identity
+            key = (intern(table_name), intern(columns))
+            values_pos = match.end()
 
-        # Check if adding this value would exceed max_bytes
-        stmt_bytes = len(values.encode("utf-8"))
-        current_bytes = table_data["bytes"]
-        total_bytes = current_bytes + stmt_bytes + 2  # +2 for comma and space
-
-        # Only flush if adding this value would exceed max_bytes
-        # For small max_bytes values (like in tests), ensure we flush after a reasonable number of statements
-        if len(table_data["values"]) > 0 and (
-            total_bytes > self.max_bytes or (self.max_bytes <= 100 and len(table_data["values"]) >= 2)
-        ):
-            # Create a merged statement from the existing values
-            result = self._create_merged_statement_for_table(table_name, table_data["columns"], table_data["values"])
-
-            # Reset the table data for the new batch
-            self.table_maps[table_name] = {
-                "columns": columns,
-                "values": [values],
-                "bytes": stmt_bytes,
-            }
-
-            return result
-
-        # Add the values to the current batch
-        table_data["values"].append(values)
-        table_data["bytes"] += stmt_bytes + 2  # +2 for comma and space
-        return None
-
-    def flush_all(self) -> List[str]:
-        """
-        Flush all pending INSERT statements, returning them as a list.
+            self._last_shape = (statement[start:values_pos], key)
 
-        Returns:
-            A list of merged INSERT statements.
+        span = _scan_values(statement, values_pos)
+        if span is None:
+            # VALUES list we can't merge safely, return as is
+            return statement
+        values = statement[span[0] : span[1]]
+
+        stmt_bytes = utf8_len(values)
+
+        with self._lock:
+            # If this is a new table and column list, initialize its entry
+            table_data = self.table_maps.get(key)
+            if table_data is None:
+                table_data = TableBatch(key[1], _statement_prefix(key[0], key[1]))
+                self.table_maps[key] = table_data
+
+            # Check if adding this value would exceed max_bytes. The buffered bytes
+            # already include a separator per value, so this is the merged size.
+            total_bytes = table_data.prefix_bytes + table_data.bytes + stmt_bytes
+
+            # Only flush if adding this value would exceed max_bytes or max_values
+            value_count = len(table_data.values)
+            if not (
+                value_count > 0
+                and (total_bytes > self.max_bytes or (self.max_values is not None and value_count >= self.max_values))
+            ):
+                # Add the values to the current batch
+                table_data.values.append(values)
+                table_data.bytes += stmt_bytes + 2  # +2 for comma and space
+                return None
+
+            # Take the existing values and start a new batch with this one
+            flushed_values = table_data.values
+            table_data.values = [values]
+            table_data.bytes = stmt_bytes + 2  # +2 for comma and space
+
+        # Create a merged statement from the existing values
+        return table_data.prefix + ", ".join(flushed_values)
+
+    def merge(self, statements: List[str]) -> List[str]:
         """
-        results: List[str] = []
-        for table_name in list(self.table_maps.keys()):
-            if self.table_maps[table_name]["values"]:
-                results.append(self._create_merged_statement(table_name))
+        Merge compatible INSERT statements in a list, preserving execution order.
 
-        # Clear the internal state
-        self.table_maps = {}
-        return results
-
-    def _create_merged_statement(self, table_name: str) -> str:
-        """
-        Create a merged INSERT statement for a specific table.
+        Buffered INSERTs are flushed before any statement that can't be merged,
+        so that statement still runs after the INSERTs that preceded it.
 
         Args:
-            table_name: The name of the table to create a statement for.
+            statements: List of SQL statements to merge.
 
         Returns:
-            A merged INSERT statement.
+            List of SQL statements with compatible INSERTs merged.
         """
-        table_data = self.table_maps[table_name]
-        columns = table_data["columns"]
-        values = table_data["values"]
-
-        # Clear the values after creating the statement
-        self.table_maps[table_name]["values"] = []
-        self.table_maps[table_name]["bytes"] = 0
+        merged_statements: List[str] = []
+
+        for statement in statements:
+            result = self.add_statement(statement)
+            if result is None:
+                continue
+            if result is statement:
+                # Returned unmerged, so flush the buffered INSERTs ahead of it
+                merged_statements.extend(self.flush_iter())
+            merged_statements.append(result)
+
+        # Ensure we get any remaining statements from the merger
+        merged_statements.extend(self.flush_iter())
+        return merged_statements
+
+    def flush_iter(self) -> Iterator[str]:
+        """
+        Flush pending INSERT statements one at a time.
 
-        return self._create_merged_statement_for_table(table_name, columns, values)
+        Each merged statement is built only when the caller asks for the next
+        one, so a caller that executes them as it goes holds one at a time.
+        Entries are removed as they are flushed; any not yet reached stay
+        buffered if iteration stops early.
 
-    def _create_merged_statement_for_table(self, table_name: str, columns: str, values: List[str]) -> str:
+        Yields:
+            Merged INSERT statements.
         """
-        Create a merged INSERT statement from table components.
+        with self._lock:
+            keys = list(self.table_maps)
+        for key in keys:
+            with self._lock:
+                table_data = self.table_maps.pop(key, None)
+            if table_data is not None and table_data.values:
+                yield table_data.prefix + ", ".join(table_data.values)
 
-        Args:
-            table_name: The name of the table.
-            columns: Column specification string, if any.
-            values: List of value tuples to insert.
+    def flush_all(self) -> List[str]:
+        """
+        Flush all pending INSERT statements, returning them as a list.
 
         Returns:
-            A merged INSERT statement.
+            A list of merged INSERT statements.
         """
-        # Build the final statement
-        if columns:
-            return f"INSERT INTO {table_name} {columns} VALUES {', '.join(values)}"
-        else:
-            return f"INSERT INTO {table_name} VALUES {', '.join(values)}"
+        return list(self.flush_iter())
@@ -2,8 +2,11 @@
 QueryCollector: A utility class for collecting and tracking SQL queries.
 """
 
+import warnings
 from typing import Any, Dict, List, Optional
 
+from sql_batcher.utils import utf8_len
+
 
 class QueryCollector:
     """
@@ -49,15 +52,18 @@ class QueryCollector:
         self.auto_adjust_for_columns = auto_adjust_for_columns
         self.merge_inserts = merge_inserts
 
-    def collect(self, query: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+    def collect(self, query: str, metadata: Optional[Dict[str, Any]] = None, size: Optional[int] = None) -> None:
         """
-        Collect a SQL query.
+        Collect a SQL query and add its size to the current size.
 
         Parameters:
             query (str): The SQL query to collect.
             metadata (Optional[Dict[str, Any]]): Optional metadata to associate with the query.
+            size (Optional[int]): Size of the query in bytes, if the caller has already
+                measured it. Measured here when not given.
         """
         self.queries.append({"query": query, "metadata": metadata or {}})
+        self.current_size += utf8_len(query) if size is None else size
 
     def clear(self) -> None:
         """Clear all collected queries."""
@@ -104,9 +110,17 @@ class QueryCollector:
         """
         Update the current size of collected queries.
 
+        Deprecated: collect() already adds each query's size, so calling this
+        after collect() counts the query twice.
+
         Parameters:
             size (int): Size to add to current size.
         """
+        warnings.warn(
+            "update_current_size is deprecated; collect() already adds the query size",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         self.current_size += size
 
     def reset(self) -> None:
@@ -9,7 +9,7 @@ import logging
 import random
 import time
 from functools import wraps
-from typing import Any, Callable, List, Optional, Type, TypeVar, cast
+from typing import Any, Callable, List, Optional, Type, TypeVar, Union, cast
 
 import asyncio
 
@@ -29,26 +29,44 @@ class RetryConfig:
         base_delay: Base delay between retries in seconds
         max_delay: Maximum delay between retries in seconds
         backoff_factor: Factor by which to increase delay after each attempt
-        jitter: Whether to add random jitter to delay
+        jitter: Jitter strategy for the delay: "full" (or True) picks a delay
+            between 0 and the backoff delay, "equal" picks one between half and
+            all of it, and "none" (or False) uses the backoff delay as is
         retryable_exceptions: List of exception types that should trigger a retry
+        rng: Random number generator used for jitter (defaults to the random module)
+        timeout: Overall time budget in seconds across all attempts, or None for no limit
     """
 
+    JITTER_MODES = ("full", "equal", "none")
+
     def __init__(
         self,
         max_attempts: int = 3,
         base_delay: float = 0.1,
         max_delay: float = 10.0,
         backoff_factor: float = 2.0,
-        jitter: bool = True,
+        jitter: Union[bool, str] = True,
         retryable_exceptions: Optional[List[Type[Exception]]] = None,
+        rng: Optional[random.Random] = None,
+        timeout: Optional[float] = None,
     ) -> None:
         """Initialize retry configuration."""
+        if isinstance(jitter, bool):
+            jitter_mode = "full" if jitter else "none"
+        elif jitter in self.JITTER_MODES:
+            jitter_mode = jitter
+        else:
+            raise ValueError(f"Invalid jitter {jitter!r}, expected a bool or one of {', '.join(self.JITTER_MODES)}")
+
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.backoff_factor = backoff_factor
         self.jitter = jitter
         self.retryable_exceptions = retryable_exceptions or []
+        self.rng = rng
+        self.timeout = timeout
+        self._jitter_mode = jitter_mode
 
     def calculate_delay(self, attempt: int) -> float:
         """
@@ -63,11 +81,12 @@ class RetryConfig:
         delay = self.base_delay * (self.backoff_factor**attempt)
         delay = min(delay, self.max_delay)
 
-        if self.jitter:
-            # Add random jitter between 0% and 25%
-            jitter_amount = random.uniform(0, 0.25)
-            delay = delay * (1 + jitter_amount)
-
+        # Spread retries out so that clients failing together don't retry together
+        rng = self.rng or random
+        if self._jitter_mode == "full":
+            return rng.uniform(0, delay)
+        if self._jitter_mode == "equal":
+            return rng.uniform(delay / 2, delay)
         return delay
 
     def should_retry(self, exception: Exception) -> bool:
@@ -92,8 +111,10 @@ def retry(
     base_delay: float = 0.1,
     max_delay: float = 10.0,
     backoff_factor: float = 2.0,
-    jitter: bool = True,
+    jitter: Union[bool, str] = True,
     retryable_exceptions: Optional[List[Type[Exception]]] = None,
+    timeout: Optional[float] = None,
+    circuit_breaker: Optional["CircuitBreaker"] = None,
 ) -> Callable[[F], F]:
     """
     Decorator for retrying a function on failure.
@@ -103,8 +124,11 @@ def retry(
         base_delay: Base delay between retries in seconds
         max_delay: Maximum delay between retries in seconds
         backoff_factor: Factor by which to increase delay after each attempt
-        jitter: Whether to add random jitter to delay
+        jitter: Jitter strategy for the delay ("full", "equal" or "none"; True means "full")
         retryable_exceptions: List of exception types that should trigger a retry
+        timeout: Overall time budget in seconds across all attempts, or None for no limit
+        circuit_breaker: Optional circuit breaker that records every attempt; retrying
+            stops with CircuitBreakerOpenError as soon as it opens
 
     Returns:
         Decorated function
@@ -116,23 +140,43 @@ def retry(
         backoff_factor=backoff_factor,
         jitter=jitter,
         retryable_exceptions=retryable_exceptions,
+        timeout=timeout,
     )
 
     def decorator(func: F) -> F:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
+            deadline = time.monotonic() + config.timeout if config.timeout is not None else None
             last_exception = None
             for attempt in range(config.max_attempts):
+                if circuit_breaker is not None and not circuit_breaker.allow_request():
+                    raise circuit_breaker.open_error() from last_exception
+
                 try:
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
                 except Exception as e:
                     last_exception = e
+                    if circuit_breaker is not None:
+                        circuit_breaker.record_failure()
                     if not config.should_retry(e) or attempt == config.max_attempts - 1:
                         raise
+                    if circuit_breaker is not None and circuit_breaker.state == CircuitBreaker.OPEN:
+                        # Don't wait for a retry the circuit breaker won't allow
+                        raise circuit_breaker.open_error() from e
 
                     delay = config.calculate_delay(attempt)
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise
+                        # Don't sleep past the overall deadline
+                        delay = min(delay, remaining)
                     logger.warning(f"Retry {attempt + 1}/{config.max_attempts} after {delay:.2f}s due to: {str(e)}")
                     time.sleep(delay)
+                else:
+                    if circuit_breaker is not None:
+                        circuit_breaker.record_success()
+                    return result
 
             # This should never happen, but just in case
             if last_exception:
@@ -149,8 +193,10 @@ def async_retry(
     base_delay: float = 0.1,
     max_delay: float = 10.0,
     backoff_factor: float = 2.0,
-    jitter: bool = True,
+    jitter: Union[bool, str] = True,
     retryable_exceptions: Optional[List[Type[Exception]]] = None,
+    timeout: Optional[float] = None,
+    circuit_breaker: Optional["CircuitBreaker"] = None,
 ) -> Callable[[AsyncF], AsyncF]:
     """
     Decorator for retrying an async function on failure.
@@ -160,8 +206,11 @@ def async_retry(
         base_delay: Base delay between retries in seconds
         max_delay: Maximum delay between retries in seconds
         backoff_factor: Factor by which to increase delay after each attempt
-        jitter: Whether to add random jitter to delay
+        jitter: Jitter strategy for the delay ("full", "equal" or "none"; True means "full")
         retryable_exceptions: List of exception types that should trigger a retry
+        timeout: Overall time budget in seconds across all attempts, or None for no limit
+        circuit_breaker: Optional circuit breaker that records every attempt; retrying
+            stops with CircuitBreakerOpenError as soon as it opens
 
     Returns:
         Decorated async function
@@ -173,23 +222,45 @@ def async_retry(
         backoff_factor=backoff_factor,
         jitter=jitter,
         retryable_exceptions=retryable_exceptions,
+        timeout=timeout,
     )
 
     def decorator(func: AsyncF) -> AsyncF:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # Use the event loop's clock, which is what asyncio.sleep is scheduled on
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + config.timeout if config.timeout is not None else None
             last_exception = None
             for attempt in range(config.max_attempts):
+                if circuit_breaker is not None and not circuit_breaker.allow_request():
+                    raise circuit_breaker.open_error() from last_exception
+
                 try:
-                    return await func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
                 except Exception as e:
                     last_exception = e
+                    if circuit_breaker is not None:
+                        circuit_breaker.record_failure()
                     if not config.should_retry(e) or attempt == config.max_attempts - 1:
                         raise
+                    if circuit_breaker is not None and circuit_breaker.state == CircuitBreaker.OPEN:
+                        # Don't wait for a retry the circuit breaker won't allow
+                        raise circuit_breaker.open_error() from e
 
                     delay = config.calculate_delay(attempt)
+                    if deadline is not None:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            raise
+                        # Don't sleep past the overall deadline
+                        delay = min(delay, remaining)
                     logger.warning(f"Async retry {attempt + 1}/{config.max_attempts} after {delay:.2f}s due to: {str(e)}")
                     await asyncio.sleep(delay)
+                else:
+                    if circuit_breaker is not None:
+                        circuit_breaker.record_success()
+                    return result
 
             # This should never happen, but just in case
             if last_exception:
@@ -241,7 +312,7 @@ class CircuitBreaker:
     def record_success(self) -> None:
         """Record a successful operation."""
         self.failure_count = 0
-        self.last_success_time = time.time()
+        self.last_success_time = time.monotonic()
         if self.state == self.HALF_OPEN:
             self.state = self.CLOSED
             logger.info("Circuit breaker closed after successful recovery")
@@ -249,7 +320,7 @@ class CircuitBreaker:
     def record_failure(self) -> None:
         """Record a failed operation."""
         self.failure_count += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = time.monotonic()
         if self.state == self.CLOSED and self.failure_count >= self.failure_threshold:
             self.state = self.OPEN
             logger.warning(f"Circuit breaker opened after {self.failure_count} consecutive failures")
@@ -264,7 +335,7 @@ class CircuitBreaker:
         Returns:
             True if the request should be allowed, False otherwise
         """
-        now = time.time()
+        now = time.monotonic()
 
         # Reset failure count if enough time has passed since the last failure
         if self.state == self.CLOSED and self.failure_count > 0 and now - self.last_failure_time > self.reset_timeout:
@@ -277,6 +348,18 @@ class CircuitBreaker:
 
         return self.state != self.OPEN
 
+    def open_error(self) -> "CircuitBreakerOpenError":
+        """
+        Create the error raised when a request is rejected by the open circuit.
+
+        Returns:
+            CircuitBreakerOpenError describing when recovery will be attempted
+        """
+        return CircuitBreakerOpenError(
+            f"Circuit breaker is open, request not allowed. "
+            f"Try again in {self.recovery_timeout - (time.monotonic() - self.last_failure_time):.1f}s"
+        )
+
     def __call__(self, func: F) -> F:
         """
         Decorator for applying circuit breaker to a function.
@@ -291,10 +374,7 @@ class CircuitBreaker:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             if not self.allow_request():
-                raise CircuitBreakerOpenError(
-                    f"Circuit breaker is open, request not allowed. "
-                    f"Try again in {self.recovery_timeout - (time.time() - self.last_failure_time):.1f}s"
-                )
+                raise self.open_error()
 
             try:
                 result = func(*args, **kwargs)
@@ -320,10 +400,7 @@ class CircuitBreaker:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
             if not self.allow_request():
-                raise CircuitBreakerOpenError(
-                    f"Circuit breaker is open, request not allowed. "
-                    f"Try again in {self.recovery_timeout - (time.time() - self.last_failure_time):.1f}s"
-                )
+                raise self.open_error()
 
             try:
                 result = await func(*args, **kwargs)
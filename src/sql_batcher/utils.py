@@ -0,0 +1,57 @@
+"""
+Utility helpers shared across SQL Batcher modules.
+"""
+
+import re
+from functools import lru_cache
+
+_SELECT_PREFIX_RE = re.compile(r"\s*SELECT\b", re.IGNORECASE)
+
+# Longest non-ASCII string whose encoded size is cached. Short strings such as
+# VALUES tuples repeat often; whole batches are unique and would only fill the cache.
+_MAX_CACHED_LEN = 256
+
+
+def utf8_len(text: str) -> int:
+    """
+    Get the size of a string in bytes when encoded as UTF-8.
+
+    ASCII strings (the common case for SQL) are measured with len() directly,
+    which avoids allocating a temporary bytes object just to count it. Sizes
+    of short non-ASCII strings are cached, since batching workloads often
+    repeat the same VALUES tuple; longer strings are encoded every time.
+
+    Args:
+        text: String to measure
+
+    Returns:
+        Size of the string in UTF-8 bytes
+    """
+    if text.isascii():
+        return len(text)
+    if len(text) <= _MAX_CACHED_LEN:
+        return _encoded_len(text)
+    return len(text.encode("utf-8"))
+
+
+@lru_cache(maxsize=4096)
+def _encoded_len(text: str) -> int:
+    """Get the UTF-8 encoded size of a non-ASCII string."""
+    return len(text.encode("utf-8"))
+
+
+def is_select(sql: str) -> bool:
+    """
+    Check whether a SQL statement is a SELECT query.
+
+    The check runs a case-insensitive match anchored at the start of the
+    string, so it never copies the statement the way
+    ``sql.strip().upper()`` would.
+
+    Args:
+        sql: SQL statement to check
+
+    Returns:
+        True if the statement starts with SELECT, False otherwise
+    """
+    return _SELECT_PREFIX_RE.match(sql) is not None
@@ -2,26 +2,40 @@
 Test configuration and fixtures.
 """
 
+import json
 import os
-from typing import Any, Dict, List
-from unittest.mock import MagicMock
+import re
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
 
 import pytest
 
+if TYPE_CHECKING:
+    from unittest.mock import MagicMock
+
+# Database marker -> (command-line option that enables its tests, skip marker used otherwise).
+# Each database's adapter tests live in test_<marker>_adapter.py.
+_DATABASES = {
+    "postgresql": ("--postgres", pytest.mark.skip(reason="PostgreSQL connection not available")),
+    "snowflake": ("--snowflake", pytest.mark.skip(reason="Snowflake connection not available")),
+    "trino": ("--trino", pytest.mark.skip(reason="Trino connection not available")),
+    "bigquery": ("--bigquery", pytest.mark.skip(reason="BigQuery connection not available")),
+}
+
+# Matches database adapter test files; the group is the marker for that database
+_ADAPTER_TEST_RE = re.compile(r"test_(postgresql|snowflake|trino|bigquery)_adapter")
 
-# Define test markers
-def pytest_configure(config: Any) -> None:
-    """Configure pytest with custom markers and options."""
-    # Add markers
-    config.addinivalue_line("markers", "core: tests that don't require database connections")
-    config.addinivalue_line("markers", "db: tests that require actual database connections")
-    config.addinivalue_line("markers", "postgresql: tests that require PostgreSQL database connections")
-    config.addinivalue_line("markers", "snowflake: tests that require Snowflake database connections")
-    config.addinivalue_line("markers", "trino: tests that require Trino database connections")
-    config.addinivalue_line("markers", "bigquery: tests that require BigQuery database connections")
 
-    # Add command-line options
-    config.addinivalue_line("addopts", "--postgres --snowflake --trino --bigquery")
+# Database adapter test files that are not collected unless their database was requested
+collect_ignore_glob: List[str] = []
+
+
+def pytest_configure(config: Any) -> None:
+    """Configure which test files are collected."""
+    # Don't import database adapter test modules (and their drivers) that would only be skipped
+    for marker, (option, _) in _DATABASES.items():
+        if not config.getoption(option):
+            collect_ignore_glob.append(f"test_{marker}_adapter.py")
 
 
 def pytest_addoption(parser: Any) -> None:
@@ -54,47 +68,56 @@ def pytest_addoption(parser: Any) -> None:
 
 def pytest_collection_modifyitems(config: Any, items: List[Any]) -> None:
     """Add markers to tests based on their requirements and skip if needed."""
-    # Add markers based on test file names
-    for item in items:
-        if "test_postgresql_adapter" in item.nodeid and "_mock" not in item.nodeid:
-            item.add_marker(pytest.mark.postgresql)
-        elif "test_snowflake_adapter" in item.nodeid and "_mock" not in item.nodeid:
-            item.add_marker(pytest.mark.snowflake)
-        elif "test_trino_adapter" in item.nodeid and "_mock" not in item.nodeid:
-            item.add_marker(pytest.mark.trino)
-        elif "test_bigquery_adapter" in item.nodeid and "_mock" not in item.nodeid:
-            item.add_marker(pytest.mark.bigquery)
-
-    # Skip tests based on available connections
-    skip_postgres = pytest.mark.skip(reason="PostgreSQL connection not available")
-    skip_snowflake = pytest.mark.skip(reason="Snowflake connection not available")
-    skip_trino = pytest.mark.skip(reason="Trino connection not available")
-    skip_bigquery = pytest.mark.skip(reason="BigQuery connection not available")
+    # Marker -> skip marker, for databases whose tests were not requested
+    skips = {marker: skip for marker, (option, skip) in _DATABASES.items() if not config.getoption(option)}
 
     for item in items:
-        if "postgresql" in item.keywords and not config.getoption("--postgres"):
-            item.add_marker(skip_postgres)
-        elif "snowflake" in item.keywords and not config.getoption("--snowflake"):
-            item.add_marker(skip_snowflake)
-        elif "trino" in item.keywords and not config.getoption("--trino"):
-            item.add_marker(skip_trino)
-        elif "bigquery" in item.keywords and not config.getoption("--bigquery"):
-            item.add_marker(skip_bigquery)
+        # Add markers based on test file names
+        nodeid = item.nodeid
+        if "_mock" not in nodeid:
+            match = _ADAPTER_TEST_RE.search(nodeid)
+            if match:
+                item.add_marker(match.group(1))
+
+        # Skip tests based on available connections
+        keywords = item.keywords
+        for marker in _DATABASES:
+            if marker in keywords:
+                if marker in skips:
+                    item.add_marker(skips[marker])
+                break
+
+
+def _probe_once(tmp_path_factory: Any, name: str, probe: Callable[[], bool]) -> bool:
+    """
+    Run a connection probe once per test session, even with pytest-xdist.
+
+    Each xdist worker runs session fixtures on its own. When filelock is
+    installed, the first worker to get here runs the probe and stores the
+    result next to the shared base temp directory; the others read it.
+    """
+    if "PYTEST_XDIST_WORKER" not in os.environ:
+        return probe()
+    try:
+        from filelock import FileLock
+    except ImportError:
+        return probe()
 
+    result_file = tmp_path_factory.getbasetemp().parent / f"{name}_connection.json"
+    with FileLock(f"{result_file}.lock"):
+        if result_file.is_file():
+            return bool(json.loads(result_file.read_text()))
+        result = probe()
+        result_file.write_text(json.dumps(result))
+        return result
 
-@pytest.fixture(scope="session")
-def has_postgres_connection() -> bool:
-    """Check if PostgreSQL connection is available."""
+
+def _probe_postgres() -> bool:
+    """Try to connect to PostgreSQL."""
     try:
         import psycopg2
 
-        conn = psycopg2.connect(
-            host=os.getenv("POSTGRES_HOST", "localhost"),
-            port=int(os.getenv("POSTGRES_PORT", "5432")),
-            user=os.getenv("POSTGRES_USER", "postgres"),
-            password=os.getenv("POSTGRES_PASSWORD", "postgres"),
-            database=os.getenv("POSTGRES_DB", "postgres"),
-        )
+        conn = psycopg2.connect(**_postgres_connection_params())
         conn.close()
         return True
     except Exception:
@@ -102,8 +125,16 @@ def has_postgres_connection() -> bool:
 
 
 @pytest.fixture(scope="session")
-def has_snowflake_connection() -> bool:
-    """Check if Snowflake connection is available."""
+def has_postgres_connection(request: Any, tmp_path_factory: Any) -> bool:
+    """Check if PostgreSQL connection is available."""
+    # Don't import the driver unless PostgreSQL tests were requested
+    if not request.config.getoption("--postgres"):
+        return False
+    return _probe_once(tmp_path_factory, "postgres", _probe_postgres)
+
+
+def _probe_snowflake() -> bool:
+    """Try to connect to Snowflake."""
     try:
         import snowflake.connector
 
@@ -122,8 +153,16 @@ def has_snowflake_connection() -> bool:
 
 
 @pytest.fixture(scope="session")
-def has_trino_connection() -> bool:
-    """Check if Trino connection is available."""
+def has_snowflake_connection(request: Any, tmp_path_factory: Any) -> bool:
+    """Check if Snowflake connection is available."""
+    # Don't import the driver unless Snowflake tests were requested
+    if not request.config.getoption("--snowflake"):
+        return False
+    return _probe_once(tmp_path_factory, "snowflake", _probe_snowflake)
+
+
+def _probe_trino() -> bool:
+    """Try to connect to Trino."""
     try:
         import trino
 
@@ -141,8 +180,16 @@ def has_trino_connection() -> bool:
 
 
 @pytest.fixture(scope="session")
-def has_bigquery_connection() -> bool:
-    """Check if BigQuery connection is available."""
+def has_trino_connection(request: Any, tmp_path_factory: Any) -> bool:
+    """Check if Trino connection is available."""
+    # Don't import the driver unless Trino tests were requested
+    if not request.config.getoption("--trino"):
+        return False
+    return _probe_once(tmp_path_factory, "trino", _probe_trino)
+
+
+def _probe_bigquery() -> bool:
+    """Try to connect to BigQuery."""
     try:
         from google.cloud import bigquery
 
@@ -154,7 +201,16 @@ def has_bigquery_connection() -> bool:
 
 
 @pytest.fixture(scope="session")
-def postgres_connection_params() -> Dict[str, Any]:
+def has_bigquery_connection(request: Any, tmp_path_factory: Any) -> bool:
+    """Check if BigQuery connection is available."""
+    # Don't import the driver unless BigQuery tests were requested
+    if not request.config.getoption("--bigquery"):
+        return False
+    return _probe_once(tmp_path_factory, "bigquery", _probe_bigquery)
+
+
+@lru_cache(maxsize=None)
+def _postgres_connection_params() -> Dict[str, Any]:
     """Get PostgreSQL connection parameters."""
     return {
         "host": os.getenv("POSTGRES_HOST", "localhost"),
@@ -166,7 +222,13 @@ def postgres_connection_params() -> Dict[str, Any]:
 
 
 @pytest.fixture(scope="session")
-def snowflake_connection_params() -> Dict[str, str]:
+def postgres_connection_params() -> Dict[str, Any]:
+    """Get PostgreSQL connection parameters."""
+    return _postgres_connection_params()
+
+
+@lru_cache(maxsize=None)
+def _snowflake_connection_params() -> Dict[str, str]:
     """Get Snowflake connection parameters."""
     return {
         "account": os.getenv("SNOWFLAKE_ACCOUNT", ""),
@@ -179,7 +241,13 @@ def snowflake_connection_params() -> Dict[str, str]:
 
 
 @pytest.fixture(scope="session")
-def trino_connection_params() -> Dict[str, Any]:
+def snowflake_connection_params() -> Dict[str, str]:
+    """Get Snowflake connection parameters."""
+    return _snowflake_connection_params()
+
+
+@lru_cache(maxsize=None)
+def _trino_connection_params() -> Dict[str, Any]:
     """Get Trino connection parameters."""
     return {
         "host": os.getenv("TRINO_HOST", "localhost"),
@@ -191,7 +259,13 @@ def trino_connection_params() -> Dict[str, Any]:
 
 
 @pytest.fixture(scope="session")
-def bigquery_connection_params() -> Dict[str, str]:
+def trino_connection_params() -> Dict[str, Any]:
+    """Get Trino connection parameters."""
+    return _trino_connection_params()
+
+
+@lru_cache(maxsize=None)
+def _bigquery_connection_params() -> Dict[str, str]:
     """Get BigQuery connection parameters."""
     return {
         "project_id": os.getenv("BIGQUERY_PROJECT_ID", ""),
@@ -200,41 +274,64 @@ def bigquery_connection_params() -> Dict[str, str]:
     }
 
 
-@pytest.fixture
-def mock_db_connection() -> MagicMock:
-    """Create a mock database connection for testing."""
-    mock_connection = MagicMock()
-    mock_cursor = MagicMock()
+@pytest.fixture(scope="session")
+def bigquery_connection_params() -> Dict[str, str]:
+    """Get BigQuery connection parameters."""
+    return _bigquery_connection_params()
+
+
+_MOCK_DESCRIPTION = [
+    ["id", "INT", None, None, None, None, None],
+    ["name", "VARCHAR", None, None, None, None, None],
+]
+
+
+def _execute_side_effect(mock_cursor: "MagicMock", sql: str) -> None:
+    """Make a mock cursor return rows for SELECT statements and nothing otherwise."""
+    if sql.strip().upper().startswith("SELECT"):
+        mock_cursor.description = list(_MOCK_DESCRIPTION)
+        mock_cursor.fetchall.return_value = [(1, "Test")]
+    else:
+        mock_cursor.description = None
+        mock_cursor.fetchall.return_value = []
+    return None
+
 
+def _configure_mock_connection(mock_connection: "MagicMock", mock_cursor: "MagicMock") -> None:
+    """Put a mock connection and its cursor back into their initial state."""
     # Configure cursor with initial state
-    mock_cursor.description = [
-        ["id", "INT", None, None, None, None, None],
-        ["name", "VARCHAR", None, None, None, None, None],
-    ]
+    mock_cursor.description = list(_MOCK_DESCRIPTION)
     mock_cursor.fetchone.return_value = (1, "Test")
     mock_cursor.fetchmany.return_value = [(1, "Test")]
     mock_cursor.fetchall.return_value = [(1, "Test")]
 
     # Configure cursor to handle execute calls
-    def execute_side_effect(sql: str) -> None:
-        if sql.strip().upper().startswith("SELECT"):
-            mock_cursor.description = [
-                ["id", "INT", None, None, None, None, None],
-                ["name", "VARCHAR", None, None, None, None, None],
-            ]
-            mock_cursor.fetchall.return_value = [(1, "Test")]
-        else:
-            mock_cursor.description = None
-            mock_cursor.fetchall.return_value = []
-        return None
-
-    # Set up the execute method with side effect
-    setattr(mock_cursor, "execute", MagicMock(side_effect=execute_side_effect))
-
-    # Set up cursor reset
-    setattr(mock_cursor, "reset_mock", MagicMock(return_value=None))
+    mock_cursor.execute.side_effect = partial(_execute_side_effect, mock_cursor)
 
     # Configure connection to return the mock cursor
-    setattr(mock_connection, "cursor", MagicMock(return_value=mock_cursor))
+    mock_connection.cursor.side_effect = None
+    mock_connection.cursor.return_value = mock_cursor
 
+
+@pytest.fixture(scope="session")
+def _session_db_connection() -> Tuple["MagicMock", "MagicMock"]:
+    """Build the mock database connection and its cursor once per session."""
+    # Imported here so collection doesn't pay for unittest.mock unless a test uses it
+    from unittest.mock import MagicMock
+
+    mock_connection = MagicMock()
+    mock_cursor = MagicMock()
+    _configure_mock_connection(mock_connection, mock_cursor)
+    return mock_connection, mock_cursor
+
+
+@pytest.fixture
+def mock_db_connection(_session_db_connection: Tuple["MagicMock", "MagicMock"]) -> "MagicMock":
+    """Get the mock database connection, reset for the current test."""
+    mock_connection, mock_cursor = _session_db_connection
+
+    # Clear recorded calls, then restore anything a previous test may have overridden
+    mock_connection.reset_mock()
+    mock_cursor.reset_mock()
+    _configure_mock_connection(mock_connection, mock_cursor)
     return mock_connection
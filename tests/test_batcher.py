@@ -53,6 +53,15 @@ class TestSQLBatcher:
         # Now we should need to flush
         assert result is True
 
+    def test_current_batch_is_a_copy(self) -> None:
+        """Test that changing current_batch doesn't change the batch itself."""
+        self.batcher.add_statement("INSERT INTO test VALUES (1)")
+
+        self.batcher.current_batch.append("INSERT INTO test VALUES (2)")
+        self.batcher.current_batch.clear()
+
+        assert self.batcher.current_batch == ["INSERT INTO test VALUES (1);"]
+
     def test_reset(self) -> None:
         """Test resetting the batch."""
         # Add a statement
@@ -170,6 +179,10 @@ class TestSQLBatcher:
         result = batcher.detect_column_count("INSERT INTO data VALUES (1, ARRAY[1, 2, 3], '{\"key\": \"value\"}', 'text')")
         assert result == 4
 
+        # Test with function calls and commas inside string literals
+        result = batcher.detect_column_count("INSERT INTO data VALUES (1, COALESCE(NULL, 2), 'a, b', NOW())")
+        assert result == 4
+
         # Test with non-INSERT statement
         result = batcher.detect_column_count("SELECT * FROM users")
         assert result is None
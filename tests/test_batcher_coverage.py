@@ -63,6 +63,20 @@ class TestSQLBatcherCoverage(unittest.TestCase):
         # Verify the query was collected
         self.assertEqual(len(query_collector.queries), 1)
 
+    def test_flush_tracks_size_in_query_collector(self):
+        """Test that a query collector passed to flush tracks the size of each flushed batch."""
+        query_collector = QueryCollector()
+        mock_adapter = MagicMock()
+
+        self.batcher.add_statement("INSERT INTO test VALUES (1)")
+        self.batcher.flush(mock_adapter.execute, query_collector)
+        self.batcher.add_statement("INSERT INTO test VALUES ('Müller')")
+        self.batcher.flush(mock_adapter.execute, query_collector)
+
+        batches = [q["query"] for q in query_collector.queries]
+        self.assertEqual(batches, ["INSERT INTO test VALUES (1);", "INSERT INTO test VALUES ('Müller');"])
+        self.assertEqual(query_collector.get_current_size(), sum(len(b.encode("utf-8")) for b in batches))
+
 
 class TestAsyncSQLBatcherCoverage(unittest.IsolatedAsyncioTestCase):
     """Test the AsyncSQLBatcher class to improve coverage."""
@@ -2,6 +2,7 @@
 Tests for the InsertMerger class.
 """
 
+import threading
 import unittest
 
 from sql_batcher.insert_merger import InsertMerger
@@ -37,8 +38,8 @@ class TestInsertMerger(unittest.TestCase):
 
         # Should buffer the statement but not return anything yet
         self.assertIsNone(result)
-        self.assertIn("test", merger.table_maps)
-        self.assertEqual(merger.table_maps["test"]["values"], ["(1)"])
+        self.assertIn(("test", ""), merger.table_maps)
+        self.assertEqual(merger.table_maps[("test", "")].values, ["(1)"])
 
     def test_add_multiple_insert_statements_same_table(self) -> None:
         """Test adding multiple INSERT statements for the same table."""
@@ -60,8 +61,8 @@ class TestInsertMerger(unittest.TestCase):
         self.assertIsNone(result3)
 
         # Check internal state
-        self.assertIn("test", merger.table_maps)
-        self.assertEqual(merger.table_maps["test"]["values"], ["(1)", "(2)", "(3)"])
+        self.assertIn(("test", ""), merger.table_maps)
+        self.assertEqual(merger.table_maps[("test", "")].values, ["(1)", "(2)", "(3)"])
 
         # Flush and check the result
         results = merger.flush_all()
@@ -83,10 +84,10 @@ class TestInsertMerger(unittest.TestCase):
         self.assertIsNone(result2)
 
         # Check internal state
-        self.assertIn("table1", merger.table_maps)
-        self.assertIn("table2", merger.table_maps)
-        self.assertEqual(merger.table_maps["table1"]["values"], ["(1)"])
-        self.assertEqual(merger.table_maps["table2"]["values"], ["(2)"])
+        self.assertIn(("table1", ""), merger.table_maps)
+        self.assertIn(("table2", ""), merger.table_maps)
+        self.assertEqual(merger.table_maps[("table1", "")].values, ["(1)"])
+        self.assertEqual(merger.table_maps[("table2", "")].values, ["(2)"])
 
         # Flush and check the results
         results = merger.flush_all()
@@ -115,9 +116,9 @@ class TestInsertMerger(unittest.TestCase):
         self.assertIsNone(result2)
 
         # Check internal state
-        self.assertIn("test", merger.table_maps)
-        self.assertEqual(merger.table_maps["test"]["columns"], "(id, name)")
-        self.assertEqual(merger.table_maps["test"]["values"], ["(1, 'Alice')", "(2, 'Bob')"])
+        self.assertIn(("test", "(id, name)"), merger.table_maps)
+        self.assertEqual(merger.table_maps[("test", "(id, name)")].columns, "(id, name)")
+        self.assertEqual(merger.table_maps[("test", "(id, name)")].values, ["(1, 'Alice')", "(2, 'Bob')"])
 
         # Flush and check the result
         results = merger.flush_all()
@@ -136,24 +137,154 @@ class TestInsertMerger(unittest.TestCase):
         # Add statement with different columns for same table
         statement2 = "INSERT INTO test (id, age) VALUES (2, 30)"
         result2 = merger.add_statement(statement2)
+        self.assertIsNone(result2)
 
-        # Should not be merged, returned as is
-        self.assertEqual(result2, statement2)
+        # Add another statement with the first set of columns
+        statement3 = "INSERT INTO test (id, name) VALUES (3, 'Carol')"
+        result3 = merger.add_statement(statement3)
+        self.assertIsNone(result3)
 
-        # Check internal state - only the first statement is buffered
-        self.assertIn("test", merger.table_maps)
-        self.assertEqual(merger.table_maps["test"]["columns"], "(id, name)")
-        self.assertEqual(merger.table_maps["test"]["values"], ["(1, 'Alice')"])
+        # Check internal state - each column list is buffered separately
+        self.assertEqual(merger.table_maps[("test", "(id, name)")].values, ["(1, 'Alice')", "(3, 'Carol')"])
+        self.assertEqual(merger.table_maps[("test", "(id, age)")].values, ["(2, 30)"])
 
-        # Flush and check the result
+        # Flush and check the results
         results = merger.flush_all()
-        self.assertEqual(len(results), 1)
-        self.assertEqual(results[0], "INSERT INTO test (id, name) VALUES (1, 'Alice')")
+        self.assertEqual(
+            results,
+            [
+                "INSERT INTO test (id, name) VALUES (1, 'Alice'), (3, 'Carol')",
+                "INSERT INTO test (id, age) VALUES (2, 30)",
+            ],
+        )
+
+    def test_column_list_whitespace(self) -> None:
+        """Test that column lists differing only in whitespace are merged together."""
+        merger = InsertMerger()
+
+        self.assertIsNone(merger.add_statement("INSERT INTO test (id, name) VALUES (1, 'Alice')"))
+        self.assertIsNone(merger.add_statement("INSERT INTO test (id,name) VALUES (2, 'Bob')"))
+        self.assertIsNone(merger.add_statement("INSERT INTO test ( id , name ) VALUES (3, 'Carol')"))
+        self.assertIsNone(merger.add_statement("INSERT INTO test (name, id) VALUES ('Dave', 4)"))
+
+        self.assertEqual(
+            merger.flush_all(),
+            [
+                "INSERT INTO test (id, name) VALUES (1, 'Alice'), (2, 'Bob'), (3, 'Carol')",
+                "INSERT INTO test (name, id) VALUES ('Dave', 4)",
+            ],
+        )
+
+    def test_same_shape_fast_path(self) -> None:
+        """Test that statements parsed via the same-shape fast path match the full parse."""
+        merger = InsertMerger()
+
+        statements = [
+            "INSERT INTO test (id, name) VALUES (1, 'Alice')",
+            "INSERT INTO test (id, name) VALUES (2, 'Bob')",
+            "INSERT INTO other VALUES (3)",
+            "INSERT INTO test (id, name) VALUES (4, 'Carol')",
+            "INSERT INTO test (id, name) VALUES (5, 'Dave')",
+        ]
+        for statement in statements:
+            self.assertIsNone(merger.add_statement(statement))
+
+        self.assertEqual(merger.table_maps[("test", "(id, name)")].columns, "(id, name)")
+        self.assertEqual(
+            merger.table_maps[("test", "(id, name)")].values,
+            ["(1, 'Alice')", "(2, 'Bob')", "(4, 'Carol')", "(5, 'Dave')"],
+        )
+        self.assertEqual(merger.table_maps[("other", "")].values, ["(3)"])
+
+    def test_leading_whitespace(self) -> None:
+        """Test that INSERT statements with leading whitespace are merged."""
+        merger = InsertMerger()
+
+        self.assertIsNone(merger.add_statement("  INSERT INTO test VALUES (1)"))
+        self.assertIsNone(merger.add_statement("\n\tINSERT INTO test VALUES (2)"))
+        self.assertIsNone(merger.add_statement("INSERT INTO test VALUES (3)  "))
+
+        self.assertEqual(merger.table_maps[("test", "")].values, ["(1)", "(2)", "(3)"])
+        self.assertEqual(merger.flush_all(), ["INSERT INTO test VALUES (1), (2), (3)"])
+
+    def test_values_with_quotes_and_nested_parentheses(self) -> None:
+        """Test that commas and parentheses inside literals and calls stay in their tuple."""
+        merger = InsertMerger()
+
+        self.assertIsNone(merger.add_statement("INSERT INTO test VALUES (1, 'a, (b)', LOWER('X'))"))
+        self.assertIsNone(merger.add_statement("INSERT INTO test VALUES (2, 'it''s)', NOW());"))
+
+        self.assertEqual(
+            merger.flush_all(),
+            ["INSERT INTO test VALUES (1, 'a, (b)', LOWER('X')), (2, 'it''s)', NOW())"],
+        )
+
+    def test_multi_row_values(self) -> None:
+        """Test that INSERTs with several VALUES tuples keep every tuple."""
+        merger = InsertMerger()
+
+        self.assertIsNone(merger.add_statement("INSERT INTO test VALUES (1), (2)"))
+        self.assertIsNone(merger.add_statement("INSERT INTO test VALUES (3)"))
+
+        self.assertEqual(merger.flush_all(), ["INSERT INTO test VALUES (1), (2), (3)"])
+
+    def test_trailing_clause_not_merged(self) -> None:
+        """Test that INSERTs with clauses after VALUES are passed through unchanged."""
+        merger = InsertMerger()
+
+        self.assertIsNone(merger.add_statement("INSERT INTO test VALUES (1)"))
+        statement = "INSERT INTO test VALUES (2) ON CONFLICT DO NOTHING"
+        self.assertEqual(merger.add_statement(statement), statement)
+        unterminated = "INSERT INTO test VALUES (3, 'oops)"
+        self.assertEqual(merger.add_statement(unterminated), unterminated)
+
+        self.assertEqual(merger.flush_all(), ["INSERT INTO test VALUES (1)"])
+
+    def test_merge_preserves_order(self) -> None:
+        """Test that merge flushes buffered INSERTs before statements it can't merge."""
+        merger = InsertMerger()
+
+        statements = [
+            "INSERT INTO test VALUES (1)",
+            "INSERT INTO test VALUES (2)",
+            "SELECT COUNT(*) FROM test",
+            "INSERT INTO test VALUES (3)",
+            "INSERT INTO other VALUES (4)",
+            "INSERT INTO test VALUES (5)",
+        ]
+
+        self.assertEqual(
+            merger.merge(statements),
+            [
+                "INSERT INTO test VALUES (1), (2)",
+                "SELECT COUNT(*) FROM test",
+                "INSERT INTO test VALUES (3), (5)",
+                "INSERT INTO other VALUES (4)",
+            ],
+        )
+        self.assertEqual(merger.table_maps, {})
+
+    def test_flush_iter(self) -> None:
+        """Test flushing merged statements lazily, one table at a time."""
+        merger = InsertMerger()
+        merger.add_statement("INSERT INTO table1 VALUES (1)")
+        merger.add_statement("INSERT INTO table2 VALUES (2)")
+
+        flushed = merger.flush_iter()
+        self.assertEqual(next(flushed), "INSERT INTO table1 VALUES (1)")
+
+        # Tables not reached yet stay buffered
+        self.assertNotIn(("table1", ""), merger.table_maps)
+        self.assertIn(("table2", ""), merger.table_maps)
+
+        self.assertEqual(list(flushed), ["INSERT INTO table2 VALUES (2)"])
+        self.assertEqual(merger.table_maps, {})
 
     def test_max_bytes_limit(self) -> None:
         """Test that merging respects the max_bytes limit."""
-        # Small max_bytes to trigger flush after 2 statements
-        merger = InsertMerger(max_bytes=50)
+        # Small max_bytes to trigger flush after 2 statements:
+        # "INSERT INTO test VALUES (1), (2)" is 32 bytes, adding ", (3)" makes 37
+        merger = InsertMerger(max_bytes=35)
 
         # Add first statement (should be buffered)
         statement1 = "INSERT INTO test VALUES (1)"
@@ -173,14 +304,62 @@ class TestInsertMerger(unittest.TestCase):
         self.assertEqual(result3, "INSERT INTO test VALUES (1), (2)")
 
         # Internal state should now contain only the third statement
-        self.assertIn("test", merger.table_maps)
-        self.assertEqual(merger.table_maps["test"]["values"], ["(3)"])
+        self.assertIn(("test", ""), merger.table_maps)
+        self.assertEqual(merger.table_maps[("test", "")].values, ["(3)"])
 
         # Flush and check the result
         results = merger.flush_all()
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0], "INSERT INTO test VALUES (3)")
 
+    def test_max_values_limit(self) -> None:
+        """Test that merging respects the max_values limit."""
+        merger = InsertMerger(max_values=2)
+
+        self.assertIsNone(merger.add_statement("INSERT INTO test VALUES (1)"))
+        self.assertIsNone(merger.add_statement("INSERT INTO test VALUES (2)"))
+        self.assertEqual(merger.add_statement("INSERT INTO test VALUES (3)"), "INSERT INTO test VALUES (1), (2)")
+
+        self.assertEqual(merger.flush_all(), ["INSERT INTO test VALUES (3)"])
+
+    def test_max_bytes_includes_statement_prefix(self) -> None:
+        """Test that merged statements, including their INSERT prefix, stay within max_bytes."""
+        merger = InsertMerger(max_bytes=200)
+
+        statements = [f"INSERT INTO test (id, name) VALUES ({i}, 'name_{i:04d}_padding')" for i in range(20)]
+        results = [result for result in map(merger.add_statement, statements) if result is not None]
+        results.extend(merger.flush_all())
+
+        self.assertGreater(len(results), 1)
+        for result in results:
+            self.assertLessEqual(len(result.encode("utf-8")), 200)
+        for i in range(20):
+            self.assertEqual(sum(f"({i}, 'name_{i:04d}_padding')" in result for result in results), 1)
+
+    def test_concurrent_add_statement(self) -> None:
+        """Test that statements added from several threads are each merged exactly once."""
+        merger = InsertMerger(max_bytes=500)
+        results = []
+        results_lock = threading.Lock()
+
+        def worker(offset: int) -> None:
+            for i in range(offset, offset + 200):
+                result = merger.add_statement(f"INSERT INTO test (id) VALUES ({i})")
+                if result is not None:
+                    with results_lock:
+                        results.append(result)
+
+        threads = [threading.Thread(target=worker, args=(n * 1000,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results.extend(merger.flush_all())
+
+        values = [value for result in results for value in result.split("VALUES ", 1)[1].split(", ")]
+        expected = [f"({n * 1000 + i})" for n in range(4) for i in range(200)]
+        self.assertEqual(sorted(values), sorted(expected))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -18,9 +18,9 @@ class TestQueryCollectorCoverage(unittest.TestCase):
         self.collector.collect("SELECT 1")
         self.collector.collect("SELECT 2")
 
-        # Verify the collector has queries
+        # Verify the collector has queries and tracked their size
         self.assertEqual(len(self.collector.queries), 2)
-        self.assertEqual(self.collector.current_size, 0)
+        self.assertEqual(self.collector.current_size, len("SELECT 1") + len("SELECT 2"))
 
         # Clear the collector
         self.collector.clear()
@@ -29,6 +29,35 @@ class TestQueryCollectorCoverage(unittest.TestCase):
         self.assertEqual(len(self.collector.queries), 0)
         self.assertEqual(self.collector.current_size, 0)
 
+    def test_collect_with_known_size(self):
+        """Test that a size passed to collect is used instead of measuring the query."""
+        self.collector.collect("SELECT 1", size=100)
+
+        self.assertEqual(self.collector.get_current_size(), 100)
+
+    def test_update_current_size_is_deprecated(self):
+        """Test that update_current_size warns but still adds to the size."""
+        with self.assertWarns(DeprecationWarning):
+            self.collector.update_current_size(10)
+
+        self.assertEqual(self.collector.get_current_size(), 10)
+
+    def test_get_batch(self):
+        """Test that get_batch returns a new list of the collected queries."""
+        self.collector.collect("SELECT 1")
+        self.collector.collect("SELECT 2")
+        batch = self.collector.get_batch()
+        self.assertEqual(batch, ["SELECT 1", "SELECT 2"])
+
+        batch.append("SELECT 3")
+        self.assertEqual(self.collector.get_batch(), ["SELECT 1", "SELECT 2"])
+        batch.pop()
+
+        self.collector.reset()
+
+        self.assertEqual(self.collector.get_batch(), [])
+        self.assertEqual(batch, ["SELECT 1", "SELECT 2"])
+
     def test_get_count(self):
         """Test getting the count of queries."""
         # Initially empty
@@ -1,9 +1,10 @@
 """Tests for the retry mechanism."""
 
+import random
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from sql_batcher.retry import RetryConfig, retry
+from sql_batcher.retry import CircuitBreaker, CircuitBreakerOpenError, RetryConfig, async_retry, retry
 
 
 class TestRetryConfig(unittest.TestCase):
@@ -51,12 +52,32 @@ class TestRetryConfig(unittest.TestCase):
         self.assertEqual(config.calculate_delay(1), 1.0)  # Second attempt (capped at max_delay)
         self.assertEqual(config.calculate_delay(2), 1.0)  # Third attempt (capped at max_delay)
 
-    @patch("random.uniform", return_value=0.1)
+    @patch("random.uniform", return_value=0.05)
     def test_calculate_delay_with_jitter(self, mock_uniform):
         """Test delay calculation with jitter."""
         config = RetryConfig(base_delay=0.1, backoff_factor=2.0, max_delay=10.0, jitter=True)
-        # With jitter of 0.1, the delay should be 0.1 * (1 + 0.1) = 0.11
-        self.assertAlmostEqual(config.calculate_delay(0), 0.11)
+        # Full jitter picks a delay between 0 and the backoff delay
+        self.assertAlmostEqual(config.calculate_delay(1), 0.05)
+        mock_uniform.assert_called_once_with(0, 0.2)
+
+    def test_calculate_delay_with_equal_jitter(self):
+        """Test delay calculation with equal jitter and an injected generator."""
+        rng = MagicMock()
+        rng.uniform.return_value = 0.3
+        config = RetryConfig(base_delay=0.1, backoff_factor=2.0, max_delay=10.0, jitter="equal", rng=rng)
+        self.assertAlmostEqual(config.calculate_delay(2), 0.3)
+        rng.uniform.assert_called_once_with(0.2, 0.4)
+
+    def test_calculate_delay_jitter_stays_under_max_delay(self):
+        """Test that jittered delays never exceed max_delay."""
+        config = RetryConfig(base_delay=1.0, backoff_factor=10.0, max_delay=2.0, rng=random.Random(42))
+        for attempt in range(5):
+            self.assertLessEqual(config.calculate_delay(attempt), 2.0)
+
+    def test_invalid_jitter(self):
+        """Test that an unknown jitter strategy is rejected."""
+        with self.assertRaises(ValueError):
+            RetryConfig(jitter="partial")
 
     def test_should_retry_with_no_exceptions(self):
         """Test should_retry with no specific exceptions."""
@@ -144,6 +165,54 @@ class TestRetryDecorator(unittest.TestCase):
         self.assertEqual(mock_func.call_count, 2)
         self.assertEqual(mock_sleep.call_count, 1)  # Sleep called once for retry
 
+    @patch("time.monotonic", side_effect=[0.0, 0.5, 1.5])
+    @patch("time.sleep")
+    def test_retry_with_timeout(self, mock_sleep, mock_monotonic):
+        """Test that retries stop once the overall timeout is used up."""
+        mock_func = MagicMock(side_effect=Exception("Error"))
+
+        # Without the timeout this would make 5 attempts with 0.8s, 1.6s, ... delays
+        decorated_func = retry(max_attempts=5, base_delay=0.8, jitter=False, timeout=1.0)(mock_func)
+
+        with self.assertRaises(Exception):
+            decorated_func()
+
+        # The first sleep is clamped to the 0.5s left, then the deadline has passed
+        self.assertEqual(mock_func.call_count, 2)
+        mock_sleep.assert_called_once_with(0.5)
+
+    @patch("time.sleep")
+    def test_retry_stops_when_circuit_opens(self, mock_sleep):
+        """Test that retrying stops as soon as the circuit breaker opens."""
+        mock_func = MagicMock(side_effect=Exception("Error"))
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        decorated_func = retry(max_attempts=5, base_delay=0.01, circuit_breaker=breaker)(mock_func)
+
+        with self.assertRaises(CircuitBreakerOpenError):
+            decorated_func()
+
+        # The second failure opens the circuit, so there is no sleep before a third attempt
+        self.assertEqual(mock_func.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+        # Later calls are rejected without calling the function
+        with self.assertRaises(CircuitBreakerOpenError):
+            decorated_func()
+        self.assertEqual(mock_func.call_count, 2)
+
+    @patch("time.sleep")
+    def test_retry_records_success_with_circuit_breaker(self, mock_sleep):
+        """Test that a successful attempt resets the circuit breaker failure count."""
+        mock_func = MagicMock(side_effect=[Exception("Error"), "success"])
+        breaker = CircuitBreaker(failure_threshold=5)
+
+        decorated_func = retry(max_attempts=3, base_delay=0.01, circuit_breaker=breaker)(mock_func)
+
+        self.assertEqual(decorated_func(), "success")
+        self.assertEqual(breaker.failure_count, 0)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
     @patch("time.sleep")
     def test_retry_with_args_and_kwargs(self, mock_sleep):
         """Test that args and kwargs are passed correctly to the function."""
@@ -170,3 +239,45 @@ class TestRetryDecorator(unittest.TestCase):
 
         # Verify the function exists
         self.assertTrue(callable(async_retry))
+
+
+class TestAsyncRetryDecorator(unittest.IsolatedAsyncioTestCase):
+    """Test the async retry decorator."""
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_async_retry_success_after_retries(self, mock_sleep):
+        """Test that an async function that succeeds after retries is awaited the expected number of times."""
+        mock_func = AsyncMock(side_effect=[Exception("Error"), "success"])
+
+        decorated_func = async_retry(max_attempts=3, base_delay=0.01)(mock_func)
+
+        self.assertEqual(await decorated_func(), "success")
+        self.assertEqual(mock_func.await_count, 2)
+        self.assertEqual(mock_sleep.await_count, 1)
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_async_retry_clamps_delay_to_timeout(self, mock_sleep):
+        """Test that the backoff delay is shortened to fit the overall timeout."""
+        mock_func = AsyncMock(side_effect=Exception("Error"))
+
+        decorated_func = async_retry(max_attempts=2, base_delay=60.0, jitter=False, timeout=5.0)(mock_func)
+
+        with self.assertRaises(Exception):
+            await decorated_func()
+
+        self.assertEqual(mock_func.await_count, 2)
+        mock_sleep.assert_awaited_once()
+        self.assertLessEqual(mock_sleep.await_args.args[0], 5.0)
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_async_retry_skips_sleep_after_timeout(self, mock_sleep):
+        """Test that no retry is attempted once the overall timeout has passed."""
+        mock_func = AsyncMock(side_effect=Exception("Error"))
+
+        decorated_func = async_retry(max_attempts=3, base_delay=0.01, timeout=0)(mock_func)
+
+        with self.assertRaises(Exception):
+            await decorated_func()
+
+        self.assertEqual(mock_func.await_count, 1)
+        mock_sleep.assert_not_awaited()
@@ -87,18 +87,6 @@ class TestSQLBatcherInsertMerging(unittest.TestCase):
                 if "(3, 'Charlie', 35)" in sql:
                     user_values_found += 1
 
-                # Check if at least some merging happened (more than one value)
-                if any(
-                    f"VALUES {v1}, {v2}" in sql.replace(" ", "")
-                    for v1, v2 in [
-                        ("(1,'Alice',30)", "(2,'Bob',25)"),
-                        ("(1,'Alice',30)", "(3,'Charlie',35)"),
-                        ("(2,'Bob',25)", "(3,'Charlie',35)"),
-                    ]
-                ):
-                    # Confirm merging is working
-                    print("Verified user values were merged!")
-
             elif "INSERT INTO products" in sql:
                 # Count product values
                 if "(101, 'Widget', 19.99)" in sql:
@@ -106,11 +94,6 @@ class TestSQLBatcherInsertMerging(unittest.TestCase):
                 if "(102, 'Gadget', 29.99)" in sql:
                     product_values_found += 1
 
-                # Check if products were merged
-                if "(101, 'Widget', 19.99)" in sql and "(102, 'Gadget', 29.99)" in sql:
-                    # Confirm merging is working
-                    print("Verified product values were merged!")
-
             elif "UPDATE users" in sql:
                 update_executed = True
 
@@ -0,0 +1,45 @@
+"""
+Tests for the shared utility helpers.
+"""
+
+from sql_batcher.utils import _encoded_len, is_select, utf8_len
+
+
+def test_utf8_len_ascii() -> None:
+    """Test measuring an ASCII statement."""
+    statement = "INSERT INTO test VALUES (1, 'Alice')"
+    assert utf8_len(statement) == len(statement.encode("utf-8"))
+
+
+def test_utf8_len_non_ascii() -> None:
+    """Test measuring a statement with multi-byte characters."""
+    statement = "INSERT INTO test VALUES (1, 'Zoë'), (2, '東京')"
+    assert utf8_len(statement) == len(statement.encode("utf-8"))
+    assert utf8_len(statement) > len(statement)
+
+
+def test_utf8_len_repeated_non_ascii() -> None:
+    """Test that repeated non-ASCII statements reuse the cached size."""
+    statement = "INSERT INTO test VALUES (1, 'Müller')"
+    assert utf8_len(statement) == len(statement.encode("utf-8"))
+
+    hits = _encoded_len.cache_info().hits
+    assert utf8_len(statement) == len(statement.encode("utf-8"))
+    assert _encoded_len.cache_info().hits == hits + 1
+
+
+def test_utf8_len_long_non_ascii_not_cached() -> None:
+    """Test that long non-ASCII strings, such as whole batches, are not kept in the cache."""
+    statement = "INSERT INTO test VALUES " + ", ".join(f"({i}, 'Müller')" for i in range(50))
+    misses = _encoded_len.cache_info().misses
+
+    assert utf8_len(statement) == len(statement.encode("utf-8"))
+    assert _encoded_len.cache_info().misses == misses
+
+
+def test_is_select() -> None:
+    """Test detecting SELECT statements regardless of case and leading whitespace."""
+    assert is_select("SELECT * FROM test")
+    assert is_select("  \n select id FROM test")
+    assert not is_select("INSERT INTO test VALUES (1)")
+    assert not is_select("SELECTED")